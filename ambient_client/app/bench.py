@@ -1,61 +1,89 @@
 import hashlib
 import json
+import os
 import time
 from dataclasses import dataclass
 from typing import Any, Dict, List, Optional
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    from blake3 import blake3 as _fingerprint_hash
+except ImportError:
+    _fingerprint_hash = hashlib.sha256
+
 from ..streaming import StreamResult
 
 
+def _dump_record(record: Dict[str, Any]) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(record)
+    return json.dumps(record).encode("utf-8")
+
+
 @dataclass(frozen=True)
 class RunSpec:
     index: int
     total: int
     warmup: bool
-    label_suffix: str
 
 
 class BenchRecorder:
+    # Records are buffered and written in batches so the hot run loop
+    # doesn't pay a write+flush syscall per record.
+    FLUSH_EVERY_RECORDS = 64
+    FLUSH_EVERY_BYTES = 64 * 1024
+
     def __init__(self, path: str) -> None:
         self._path = path
         self._file = None
+        self._buf = bytearray()
+        self._count = 0
         try:
-            self._file = open(path, "a", encoding="utf-8")
+            self._file = open(path, "ab", buffering=0)
         except OSError as exc:
             print(f"Warning: cannot open bench file '{path}': {exc}")
 
     def write(self, record: Dict[str, Any]) -> None:
-        if self._file:
-            try:
-                self._file.write(json.dumps(record) + "\n")
-                self._file.flush()
-            except OSError as exc:
-                print(f"Warning: bench write error: {exc}")
+        if not self._file:
+            return
+        self._buf += _dump_record(record)
+        self._buf += b"\n"
+        self._count += 1
+        if self._count >= self.FLUSH_EVERY_RECORDS or len(self._buf) > self.FLUSH_EVERY_BYTES:
+            self._flush()
+
+    def _flush(self) -> None:
+        if not self._buf:
+            return
+        try:
+            self._file.write(self._buf)
+        except OSError as exc:
+            print(f"Warning: bench write error: {exc}")
+        self._buf.clear()
+        self._count = 0
 
     def close(self) -> None:
         if self._file:
+            self._flush()
+            # Durability is paid once here instead of per record.
+            try:
+                os.fsync(self._file.fileno())
+            except OSError:
+                pass
             self._file.close()
 
 
 def iter_run_specs(bench_enabled: bool, warmup_runs: int, bench_runs: int) -> List[RunSpec]:
+    # Labels are derived from index/warmup at the print site, so specs
+    # carry no preformatted strings.
     if not bench_enabled:
-        return [RunSpec(index=0, total=1, warmup=False, label_suffix="")]
-    specs = []
-    for i in range(warmup_runs):
-        specs.append(RunSpec(
-            index=i,
-            total=warmup_runs + bench_runs,
-            warmup=True,
-            label_suffix=f" [warmup {i + 1}/{warmup_runs}]",
-        ))
-    for i in range(bench_runs):
-        specs.append(RunSpec(
-            index=warmup_runs + i,
-            total=warmup_runs + bench_runs,
-            warmup=False,
-            label_suffix=f" [run {i + 1}/{bench_runs}]",
-        ))
-    return specs
+        return [RunSpec(index=0, total=1, warmup=False)]
+    total = warmup_runs + bench_runs
+    return [RunSpec(index=i, total=total, warmup=i < warmup_runs) for i in range(total)]
 
 
 def build_bench_meta(
@@ -70,7 +98,7 @@ def build_bench_meta(
         "warmup_runs": warmup_runs,
         "bench_runs": bench_runs,
         "stall_threshold_ms": stall_threshold_ms,
-        "prompt_hash": hashlib.sha256(prompt.encode()).hexdigest()[:16],
+        "prompt_hash": _fingerprint_hash(prompt.encode()).hexdigest()[:16],
         "request_params": params,
     }
 
@@ -88,8 +116,8 @@ def build_bench_record(provider: str, model: str, api_url: str, spec: RunSpec) -
 def attach_result_metrics(record: Dict, result: StreamResult) -> Dict:
     record = dict(record)
     record.update({
-        "ttfb_ms": round(result.ttfb_ms, 2) if result.ttfb_ms is not None else None,
-        "ttc_ms": round(result.ttc_ms, 2) if result.ttc_ms is not None else None,
+        "ttfb_ms": result.ttfb_ms,
+        "ttc_ms": result.ttc_ms,
         "prompt_tokens": result.prompt_tokens,
         "completion_tokens": result.completion_tokens,
         "text_chars": len(result.text),
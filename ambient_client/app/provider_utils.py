@@ -1,9 +1,18 @@
+import functools
 import os
+import re
 from dataclasses import dataclass
 from typing import List, Optional
 
 from ..utils import is_enabled
 
+_SANITIZE_RE = re.compile(r"[^0-9A-Za-z]")
+
+
+def _env_str(key: str) -> str:
+    v = os.environ.get(key)
+    return v.strip() if v else ""
+
 
 @dataclass
 class ProviderSettings:
@@ -28,10 +37,10 @@ def build_chat_completions_url(
     base_url_env: str,
     default_url: str,
 ) -> str:
-    explicit = os.getenv(api_url_env, "").strip()
+    explicit = _env_str(api_url_env)
     if explicit:
         return explicit
-    base = os.getenv(base_url_env, "").strip()
+    base = _env_str(base_url_env)
     if base:
         base = base.rstrip("/")
         if not base.endswith("/chat/completions"):
@@ -51,13 +60,15 @@ def parse_models(raw: str) -> List[str]:
     return result
 
 
+@functools.lru_cache(maxsize=256)
 def model_flag_env_key(prefix: str, model: str) -> str:
-    sanitized = "".join(c if c.isalnum() else "_" for c in model).upper()
+    sanitized = _SANITIZE_RE.sub("_", model).upper()
     return f"{prefix}_MODEL_{sanitized}_ENABLED"
 
 
 def filter_enabled_models(prefix: str, models: List[str]) -> List[str]:
-    return [m for m in models if is_enabled(os.getenv(model_flag_env_key(prefix, m)))]
+    env = os.environ
+    return [m for m in models if is_enabled(env.get(model_flag_env_key(prefix, m)))]
 
 
 def get_provider_settings(
@@ -73,17 +84,17 @@ def get_provider_settings(
     default_model: str,
     default_enabled: bool = True,
 ) -> ProviderSettings:
-    enabled = is_enabled(os.getenv(enabled_env), default=default_enabled)
+    enabled = is_enabled(os.environ.get(enabled_env), default=default_enabled)
     api_url = build_chat_completions_url(api_url_env, base_url_env, default_url)
 
     api_key = ""
     for env_key in api_key_envs:
-        api_key = os.getenv(env_key, "").strip()
+        api_key = _env_str(env_key)
         if api_key:
             break
 
-    raw_models = os.getenv(models_env, "").strip()
-    models = parse_models(raw_models) if raw_models else [os.getenv(model_env, default_model).strip()]
+    raw_models = _env_str(models_env)
+    models = parse_models(raw_models) if raw_models else [os.environ.get(model_env, default_model).strip()]
     models = filter_enabled_models(prefix, models)
 
     return ProviderSettings(
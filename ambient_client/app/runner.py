@@ -3,7 +3,7 @@ from dataclasses import dataclass
 from typing import Optional
 
 from ..config import load_env_file
-from ..streaming import stream_chat
+from ..streaming import build_base_payload, stream_chat
 from ..utils import is_enabled
 from .ambient import get_ambient_settings
 from .bench import (
@@ -31,15 +31,23 @@ class EnvConfig:
 
 
 def _load_env_config() -> EnvConfig:
+    # Look everything up through one environment snapshot instead of a
+    # fresh os.getenv (default allocation + strip) per key.
+    env = os.environ
+
+    def _s(key: str) -> str:
+        v = env.get(key)
+        return v.strip() if v else ""
+
     def _float(key: str) -> Optional[float]:
-        v = os.getenv(key, "").strip()
+        v = _s(key)
         try:
             return float(v) if v else None
         except ValueError:
             return None
 
     def _int(key: str) -> Optional[int]:
-        v = os.getenv(key, "").strip()
+        v = _s(key)
         try:
             return int(v) if v else None
         except ValueError:
@@ -49,14 +57,14 @@ def _load_env_config() -> EnvConfig:
         temperature=_float("REQUEST_TEMPERATURE"),
         max_tokens=_int("REQUEST_MAX_TOKENS"),
         top_p=_float("REQUEST_TOP_P"),
-        verbose=is_enabled(os.getenv("REQUEST_VERBOSE"), default=True),
-        save_receipt=is_enabled(os.getenv("AMBIENT_RECEIPT_SAVE"), default=False),
-        receipt_dir=os.getenv("AMBIENT_RECEIPT_DIR", "data/receipts"),
-        stall_threshold_ms=float(os.getenv("BENCH_STALL_THRESHOLD_MS", "2000")),
-        bench_enabled=is_enabled(os.getenv("BENCH_ENABLED"), default=False),
-        bench_warmup=int(os.getenv("BENCH_WARMUP_RUNS", "1")),
-        bench_runs=int(os.getenv("BENCH_RUNS", "3")),
-        bench_output=os.getenv("BENCH_OUTPUT", "data/bench.jsonl"),
+        verbose=is_enabled(env.get("REQUEST_VERBOSE"), default=True),
+        save_receipt=is_enabled(env.get("AMBIENT_RECEIPT_SAVE"), default=False),
+        receipt_dir=env.get("AMBIENT_RECEIPT_DIR", "data/receipts"),
+        stall_threshold_ms=float(env.get("BENCH_STALL_THRESHOLD_MS", "2000")),
+        bench_enabled=is_enabled(env.get("BENCH_ENABLED"), default=False),
+        bench_warmup=int(env.get("BENCH_WARMUP_RUNS", "1")),
+        bench_runs=int(env.get("BENCH_RUNS", "3")),
+        bench_output=env.get("BENCH_OUTPUT", "data/bench.jsonl"),
     )
 
 
@@ -70,6 +78,7 @@ def run() -> None:
         return
 
     providers = [get_ambient_settings()]
+    base_payload = build_base_payload(cfg.temperature, cfg.max_tokens, cfg.top_p)
 
     for provider in providers:
         err = provider.validation_error()
@@ -85,17 +94,20 @@ def run() -> None:
             print(f"\n--- {provider.name} / {model} ---")
 
             for spec in specs:
-                label = f"{provider.name}/{model}{spec.label_suffix}"
-                print(f"\n[{label}]")
+                if not cfg.bench_enabled:
+                    suffix = ""
+                elif spec.warmup:
+                    suffix = f" [warmup {spec.index + 1}/{cfg.bench_warmup}]"
+                else:
+                    suffix = f" [run {spec.index - cfg.bench_warmup + 1}/{cfg.bench_runs}]"
+                print(f"\n[{provider.name}/{model}{suffix}]")
 
                 result = stream_chat(
                     api_url=provider.api_url,
                     api_key=provider.api_key,
                     model=model,
                     messages=messages,
-                    temperature=cfg.temperature,
-                    max_tokens=cfg.max_tokens,
-                    top_p=cfg.top_p,
+                    base_payload=base_payload,
                     stall_threshold_ms=cfg.stall_threshold_ms,
                     save_receipt=cfg.save_receipt,
                     receipt_dir=cfg.receipt_dir,
@@ -108,8 +120,8 @@ def run() -> None:
                     if not cfg.verbose:
                         print(result.text[:200])
                     print(
-                        f"\n[ttfb={result.ttfb_ms:.0f}ms "
-                        f"ttc={result.ttc_ms:.0f}ms "
+                        f"\n[ttfb={result.ttfb_ms}ms "
+                        f"ttc={result.ttc_ms}ms "
                         f"stalls={result.stall_count}]"
                     )
 
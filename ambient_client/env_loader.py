@@ -1,19 +1,35 @@
 import os
+import re
 from pathlib import Path
 
+# One match per assignment line; comment-only and malformed lines simply
+# don't match, so there is no per-line Python filtering. The export
+# prefix sits inside a capturing lookahead consumed by \1 — lookarounds
+# don't backtrack, so "export =x" is malformed rather than an
+# assignment to a variable named "export". (A possessive (?:...)?+
+# would read better but needs Python 3.11; we support 3.10.)
+# The value keeps its leading whitespace so the comment stripper can
+# still see it: "KEY= # note" is an empty value plus comment, while
+# "KEY=#ff0000" is a literal leading-# value.
+_LINE_RE = re.compile(
+    r"^[^\S\n]*(?=((?:export[^\S\n]+)?))\1([A-Za-z_][A-Za-z0-9_]*)[^\S\n]*=(.*)$",
+    re.MULTILINE,
+)
+
+# Quoted spans are consumed first so a # inside quotes never starts a
+# comment. Only a whitespace-preceded # starts one: this runs on the
+# bare value, where a leading # is part of the value (KEY=#ff0000) —
+# comment-only lines never reach here because _LINE_RE skips them.
+_COMMENT_RE = re.compile(
+    r'''"(?:[^"\\]|\\.)*"|'(?:[^'\\]|\\.)*'|(?<=\s)(#.*)$'''
+)
+
 
 def _strip_inline_comment(line: str) -> str:
     """Remove inline # comments, respecting quoted strings."""
-    in_quote = None
-    for i, ch in enumerate(line):
-        if ch in ('"', "'"):
-            if in_quote is None:
-                in_quote = ch
-            elif in_quote == ch:
-                in_quote = None
-        elif ch == "#" and in_quote is None:
-            if i == 0 or line[i - 1].isspace():
-                return line[:i].rstrip()
+    for m in _COMMENT_RE.finditer(line):
+        if m.group(1) is not None:
+            return line[: m.start(1)].rstrip()
     return line
 
 
@@ -23,17 +39,10 @@ def load_env(path: Path) -> None:
         text = path.read_text(encoding="utf-8")
     except OSError:
         return
-    for raw in text.splitlines():
-        line = raw.strip()
-        if not line or line.startswith("#"):
-            continue
-        if line.startswith("export "):
-            line = line[7:].lstrip()
-        line = _strip_inline_comment(line)
-        if "=" not in line:
+    for m in _LINE_RE.finditer(text):
+        key = m.group(2)
+        # Existing vars win, so skip before doing any value work — on
+        # reloads this avoids the comment-strip and quote-strip copies.
+        if key in os.environ:
             continue
-        key, _, value = line.partition("=")
-        key = key.strip()
-        value = value.strip().strip('"').strip("'")
-        if key and key not in os.environ:
-            os.environ[key] = value
+        os.environ[key] = _strip_inline_comment(m.group(3)).strip().strip('"').strip("'")
@@ -5,3 +5,10 @@ def is_enabled(value: Optional[str], default: bool = True) -> bool:
     if value is None:
         return default
     return value.strip().lower() not in ("0", "false", "no")
+
+
+def truncate(text: str, limit: int = 80) -> str:
+    """Shorten text to limit chars with an ellipsis; no copy when it fits."""
+    if len(text) <= limit:
+        return text
+    return text[:limit] + "…"
@@ -12,14 +12,16 @@ Usage:
 import argparse
 import os
 import statistics
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
-from typing import Dict, List, Optional
+from typing import Dict, List, Optional, Tuple
 
 from ambient_client.app.ambient import get_ambient_settings
 from ambient_client.app.openai_provider import get_openai_settings
 from ambient_client.app.provider_utils import ProviderSettings
 from ambient_client.config import load_env_file
-from ambient_client.streaming import StreamResult, stream_chat
+from ambient_client.streaming import StreamResult, build_base_payload, stream_chat
+from ambient_client.utils import truncate
 
 # ---------------------------------------------------------------------------
 # Cost rates (USD per 1 million tokens)
@@ -57,8 +59,8 @@ def _estimate_cost(prompt_tokens: float, completion_tokens: float, rates: Dict[s
 class ProviderStats:
     name: str
     model: str
-    ttfb_ms: List[float] = field(default_factory=list)
-    ttc_ms: List[float] = field(default_factory=list)
+    ttfb_ms: List[int] = field(default_factory=list)
+    ttc_ms: List[int] = field(default_factory=list)
     prompt_tokens: List[int] = field(default_factory=list)
     completion_tokens: List[int] = field(default_factory=list)
     stalls: int = 0
@@ -79,12 +81,23 @@ class ProviderStats:
         self.stalls += result.stall_count
 
     def avg(self, values: List[float]) -> Optional[float]:
-        return statistics.mean(values) if values else None
+        return statistics.fmean(values) if values else None
+
+    def p95(self, values: List[float]) -> Optional[float]:
+        if not values:
+            return None
+        if len(values) < 2:
+            return float(values[0])
+        return statistics.quantiles(values, n=20)[-1]
 
     def format_ms(self, values: List[float]) -> str:
         v = self.avg(values)
         return f"{v:,.0f} ms" if v is not None else "n/a"
 
+    def format_p95_ms(self, values: List[float]) -> str:
+        v = self.p95(values)
+        return f"{v:,.0f} ms" if v is not None else "n/a"
+
     def format_tokens(self, values: List[int]) -> str:
         v = self.avg(values)
         return f"{v:,.1f}" if v is not None else "n/a"
@@ -105,15 +118,16 @@ class ProviderStats:
 # Table printer
 # ---------------------------------------------------------------------------
 
-def _col_width(values: List[str], header: str) -> int:
-    return max(len(header), max((len(v) for v in values), default=0)) + 2
-
-
 def _print_table(rows: List[tuple], headers: List[str]) -> None:
-    col_widths = [
-        _col_width([str(r[i]) for r in rows], headers[i])
-        for i in range(len(headers))
-    ]
+    # Stringify each cell once and compute all column widths in a single
+    # pass over the rows, instead of a per-column scan.
+    str_rows = [[str(c) for c in row] for row in rows]
+    col_widths = [len(h) + 2 for h in headers]
+    for row in str_rows:
+        for i, cell in enumerate(row):
+            if len(cell) + 2 > col_widths[i]:
+                col_widths[i] = len(cell) + 2
+
     sep = "┼".join("─" * w for w in col_widths)
     top = "┬".join("─" * w for w in col_widths)
     bot = "┴".join("─" * w for w in col_widths)
@@ -122,8 +136,8 @@ def _print_table(rows: List[tuple], headers: List[str]) -> None:
     header_row = "│".join(f" {headers[i]:<{col_widths[i]-1}}" for i in range(len(headers)))
     print(f"│{header_row}│")
     print(f"├{sep}┤")
-    for row in rows:
-        line = "│".join(f" {str(row[i]):<{col_widths[i]-1}}" for i in range(len(headers)))
+    for row in str_rows:
+        line = "│".join(f" {row[i]:<{col_widths[i]-1}}" for i in range(len(headers)))
         print(f"│{line}│")
     print(f"└{bot}┘")
 
@@ -142,6 +156,52 @@ def _parse_args() -> argparse.Namespace:
     return p.parse_args()
 
 
+def _run_provider(
+    provider: ProviderSettings,
+    args: argparse.Namespace,
+    messages: List[dict],
+) -> Tuple[Optional[ProviderStats], List[str]]:
+    """Run all warmup+timed calls for one provider.
+
+    Output is buffered and returned as lines so providers can run
+    concurrently without interleaving their progress prints.
+    """
+    lines: List[str] = []
+    err = provider.validation_error()
+    if err:
+        lines.append(f"Skipping {provider.name}: {err}")
+        return None, lines
+
+    total_runs = args.warmup + args.runs
+    model = provider.models[0]
+    stats = ProviderStats(name=provider.name, model=model)
+    base_payload = build_base_payload(temperature=args.temperature, max_tokens=args.max_tokens)
+
+    lines.append(f"\n[{provider.name} / {model}]  {total_runs} run(s)  (warmup={args.warmup})")
+
+    for i in range(total_runs):
+        label = f"warmup {i+1}" if i < args.warmup else f"run {i - args.warmup + 1}/{args.runs}"
+
+        result = stream_chat(
+            api_url=provider.api_url,
+            api_key=provider.api_key,
+            model=model,
+            messages=messages,
+            base_payload=base_payload,
+        )
+
+        if result.error:
+            lines.append(f"  {label} ... ERROR: {result.error}")
+        else:
+            lines.append(f"  {label} ... ttfb={result.ttfb_ms}ms  ttc={result.ttc_ms}ms  "
+                         f"tok={result.prompt_tokens}+{result.completion_tokens}")
+
+        if i >= args.warmup:
+            stats.add(result)
+
+    return stats, lines
+
+
 def main() -> None:
     load_env_file()
     args = _parse_args()
@@ -158,43 +218,19 @@ def main() -> None:
         print("No providers enabled. Set AMBIENT_ENABLED=true or OPENAI_ENABLED=true in .env")
         return
 
-    total_runs = args.warmup + args.runs
     messages = [{"role": "user", "content": prompt}]
     all_stats: List[ProviderStats] = []
 
-    for provider in active:
-        err = provider.validation_error()
-        if err:
-            print(f"Skipping {provider.name}: {err}")
-            continue
-
-        model = provider.models[0]
-        stats = ProviderStats(name=provider.name, model=model)
-        all_stats.append(stats)
-
-        print(f"\n[{provider.name} / {model}]  {total_runs} run(s)  (warmup={args.warmup})")
-
-        for i in range(total_runs):
-            label = f"warmup {i+1}" if i < args.warmup else f"run {i - args.warmup + 1}/{args.runs}"
-            print(f"  {label} ... ", end="", flush=True)
-
-            result = stream_chat(
-                api_url=provider.api_url,
-                api_key=provider.api_key,
-                model=model,
-                messages=messages,
-                temperature=args.temperature,
-                max_tokens=args.max_tokens,
-            )
-
-            if result.error:
-                print(f"ERROR: {result.error}")
-            else:
-                print(f"ttfb={result.ttfb_ms:.0f}ms  ttc={result.ttc_ms:.0f}ms  "
-                      f"tok={result.prompt_tokens}+{result.completion_tokens}")
-
-            if i >= args.warmup:
-                stats.add(result)
+    # Each run is network-bound, so independent providers can overlap:
+    # total wallclock drops from the sum of their TTCs to the max.
+    # Runs stay sequential within a provider to keep TTFB numbers clean.
+    with ThreadPoolExecutor(max_workers=len(active)) as pool:
+        futures = [pool.submit(_run_provider, p, args, messages) for p in active]
+        for future in futures:
+            stats, lines = future.result()
+            print("\n".join(lines))
+            if stats is not None:
+                all_stats.append(stats)
 
     if not all_stats:
         print("\nNo results to display.")
@@ -203,7 +239,7 @@ def main() -> None:
     print(f"\n\n{'─'*64}")
     print("  BENCHMARK RESULTS")
     print(f"{'─'*64}")
-    print(f"  Prompt : {prompt[:80]}{'…' if len(prompt) > 80 else ''}")
+    print(f"  Prompt : {truncate(prompt)}")
     print(f"  Runs   : {args.runs}  |  max_tokens={args.max_tokens}  temperature={args.temperature}")
     print()
 
@@ -212,7 +248,9 @@ def main() -> None:
 
     rows = [
         ("Avg TTFB",              *[s.format_ms(s.ttfb_ms)         for s in all_stats]),
+        ("p95 TTFB",              *[s.format_p95_ms(s.ttfb_ms)     for s in all_stats]),
         ("Avg TTC (total)",       *[s.format_ms(s.ttc_ms)          for s in all_stats]),
+        ("p95 TTC",               *[s.format_p95_ms(s.ttc_ms)      for s in all_stats]),
         ("Prompt tokens (avg)",   *[s.format_tokens(s.prompt_tokens)     for s in all_stats]),
         ("Completion tokens",     *[s.format_tokens(s.completion_tokens) for s in all_stats]),
         ("Est. cost / call",      *[s.format_cost(r) for s, r in zip(all_stats, rates_list)]),
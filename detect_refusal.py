@@ -12,16 +12,43 @@ Refusals are routed to a human review queue (JSONL file).
 """
 
 import argparse
+import atexit
+import functools
+import hashlib
 import json
 import os
 import re
+import sqlite3
 import time
+from concurrent.futures import ThreadPoolExecutor
 from dataclasses import dataclass, field
 from enum import Enum
 from pathlib import Path
-from typing import List, Optional, Tuple
+from typing import Iterator, List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from ambient_client.config import load_env_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+else:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
+
+def _dumps(obj: dict) -> bytes:
+    if orjson is not None:
+        return orjson.dumps(obj)
+    return json.dumps(obj).encode("utf-8")
+
 
 # ---------------------------------------------------------------------------
 # Defaults
@@ -34,6 +61,7 @@ DEFAULT_PROMPT = (
 DEFAULT_MODEL = "zai-org/GLM-4.6"
 DEFAULT_API_URL = "https://api.ambient.xyz/v1/chat/completions"
 DEFAULT_REVIEW_FILE = "data/human_review.jsonl"
+DEFAULT_CACHE_FILE = "data/response_cache.db"
 
 # ---------------------------------------------------------------------------
 # Refusal states & patterns
@@ -47,45 +75,75 @@ class RefusalState(Enum):
     REFUSED_UNCERTAIN = "REFUSED_UNCERTAIN"
 
 
-# Ordered by priority — first state with the most pattern hits wins
-_PATTERNS: List[Tuple[RefusalState, List[str]]] = [
+# Ordered by priority — first state with the most pattern hits wins.
+# Frozen as tuples: the table is scan-only after import, and tuples keep
+# the hot loop on constant, hashable structures.
+_PATTERNS: Tuple[Tuple[RefusalState, Tuple[str, ...]], ...] = (
     (
         RefusalState.REFUSED_INSUFFICIENT_DATA,
-        [
-            r"not enough (information|data|context)",
-            r"insufficient (data|information|context)",
-            r"lack(ing)? (the )?(data|information|context)",
-            r"(cannot|can't|unable to) (access|retrieve|fetch|get) (real.?time|live|current|up.?to.?date)",
-            r"(no|don't have) access to (real.?time|live|current|market)",
-            r"my (knowledge|training) (cutoff|data)",
-            r"as of my (last|knowledge) (update|cutoff)",
-        ],
+        (
+            r"not enough (?:information|data|context)",
+            r"insufficient (?:data|information|context)",
+            r"lack(?:ing)? (?:the )?(?:data|information|context)",
+            r"(?:cannot|can't|unable to) (?:access|retrieve|fetch|get) (?:real.?time|live|current|up.?to.?date)",
+            r"(?:no|don't have) access to (?:real.?time|live|current|market)",
+            r"my (?:knowledge|training) (?:cutoff|data)",
+            r"as of my (?:last|knowledge) (?:update|cutoff)",
+        ),
     ),
     (
         RefusalState.REFUSED_AMBIGUOUS,
-        [
-            r"(unclear|ambiguous|vague|broad) (request|question|query|prompt)",
-            r"(multiple|several|different) (interpretations|meanings|ways to (read|interpret))",
-            r"could (mean|refer to|be interpreted as) (many|several|multiple)",
-            r"depends on (what you mean|how you define|your definition)",
-            r"(more )?(specific|context|detail|clarity|clarification) (needed|required|would help)",
-            r"(clarify|specify|narrow down)",
-        ],
+        (
+            r"(?:unclear|ambiguous|vague|broad) (?:request|question|query|prompt)",
+            r"(?:multiple|several|different) (?:interpretations|meanings|ways to (?:read|interpret))",
+            r"could (?:mean|refer to|be interpreted as) (?:many|several|multiple)",
+            r"depends on (?:what you mean|how you define|your definition)",
+            r"(?:more )?(?:specific|context|detail|clarity|clarification) (?:needed|required|would help)",
+            r"(?:clarify|specify|narrow down)",
+        ),
     ),
     (
         RefusalState.REFUSED_UNCERTAIN,
-        [
-            r"(cannot|can't|unable to) (guarantee|predict|determine|say for certain|be sure)",
-            r"(no|not a) (financial|investment) (advice|advisor|guidance)",
-            r"(past performance|historical (data|returns)) (does not|doesn't|is not|isn't) (guarantee|predict)",
-            r"(significant|high|considerable) (risk|uncertainty|volatility)",
-            r"(should|must|need to) (consult|speak (with|to)|seek) (a |an )?(financial|professional|qualified)",
-            r"i('m| am) not (able|in a position|qualified) to (recommend|advise|suggest)",
-            r"this (is not|isn't) (financial|investment) advice",
-            r"(market|price) (is|are|can be) (unpredictable|volatile|subject to)",
-        ],
+        (
+            r"(?:cannot|can't|unable to) (?:guarantee|predict|determine|say for certain|be sure)",
+            r"(?:no|not a) (?:financial|investment) (?:advice|advisor|guidance)",
+            r"(?:past performance|historical (?:data|returns)) (?:does not|doesn't|is not|isn't) (?:guarantee|predict)",
+            r"(?:significant|high|considerable) (?:risk|uncertainty|volatility)",
+            r"(?:should|must|need to) (?:consult|speak (?:with|to)|seek) (?:a |an )?(?:financial|professional|qualified)",
+            r"i(?:'m| am) not (?:able|in a position|qualified) to (?:recommend|advise|suggest)",
+            r"this (?:is not|isn't) (?:financial|investment) advice",
+            r"(?:market|price) (?:is|are|can be) (?:unpredictable|volatile|subject to)",
+        ),
     ),
-]
+)
+
+# Flat lookup tables so the scan loop indexes tuples directly instead of
+# unpacking (state, patterns) pairs per hit.
+_STATES: Tuple[RefusalState, ...] = tuple(state for state, _ in _PATTERNS)
+_PATTERN_STRS: Tuple[Tuple[str, ...], ...] = tuple(pats for _, pats in _PATTERNS)
+
+
+@functools.lru_cache(maxsize=1)
+def _master_union() -> "re.Pattern":
+    """Union every state's patterns into one compiled alternation.
+
+    A single finditer pass over the text reports hits for all three
+    states at once — the multi-pattern single-scan idea behind
+    Aho-Corasick, expressed with the stdlib regex engine. Group names
+    encode (state index, pattern index) so hits map back to the
+    original pattern strings for reporting.
+
+    Compiled lazily and memoized: invocations that never classify
+    anything (--help, missing API key, request errors) skip the
+    compile cost entirely.
+    """
+    parts = []
+    for si, (_, patterns) in enumerate(_PATTERNS):
+        for pi, pattern in enumerate(patterns):
+            parts.append(f"(?P<s{si}p{pi}>{pattern})")
+    # IGNORECASE lets the scan run on the original text; no lowered
+    # full-text copy per classification.
+    return re.compile("|".join(parts), re.IGNORECASE)
 
 # ---------------------------------------------------------------------------
 # Detection
@@ -101,24 +159,29 @@ class RefusalDecision:
 
 def detect_refusal(text: str) -> RefusalDecision:
     """Classify a model response into a RefusalState."""
-    lowered = text.lower()
-    matches: List[Tuple[RefusalState, str]] = []
-
-    for state, patterns in _PATTERNS:
-        for pattern in patterns:
-            if re.search(pattern, lowered):
-                matches.append((state, pattern))
+    # Tally hits per state in one scan of the text. With only three
+    # refusal states, fixed-size lists indexed by state ordinal beat a
+    # dict built with setdefault on every call.
+    counts = [0, 0, 0]
+    reasons: List[List[str]] = [[], [], []]
+    seen: set = set()
+    for m in _master_union().finditer(text):
+        g = m.lastgroup
+        if g is None or g in seen:
+            continue
+        seen.add(g)
+        si, pi = g[1:].split("p")
+        si = int(si)
+        counts[si] += 1
+        reasons[si].append(_PATTERN_STRS[si][int(pi)])
 
-    if not matches:
+    if not seen:
         return RefusalDecision(state=RefusalState.ANSWERED, reasons=[], confidence=0.95)
 
-    # tally hits per state
-    counts: dict = {}
-    for state, pattern in matches:
-        counts.setdefault(state, []).append(pattern)
-
-    dominant_state = max(counts, key=lambda s: len(counts[s]))
-    matched_patterns = counts[dominant_state]
+    # max picks the lowest index on ties, preserving _PATTERNS priority
+    si = max(range(3), key=counts.__getitem__)
+    dominant_state = _STATES[si]
+    matched_patterns = reasons[si]
 
     # confidence scales with number of matched patterns (capped at 0.97)
     confidence = min(0.60 + 0.12 * len(matched_patterns), 0.97)
@@ -157,6 +220,32 @@ def route(
             print(f"  Logged to        : {review_file}")
 
 
+# Review-queue handles stay open for the life of the process so bursts of
+# escalations share one buffered file instead of an open/write/close per
+# record; atexit flushes whatever is still buffered.
+_REVIEW_HANDLES: dict = {}
+
+
+def _close_review_handles() -> None:
+    for fh in _REVIEW_HANDLES.values():
+        try:
+            fh.close()
+        except OSError:
+            pass
+    _REVIEW_HANDLES.clear()
+
+
+def _review_handle(path: str):
+    fh = _REVIEW_HANDLES.get(path)
+    if fh is None:
+        Path(path).parent.mkdir(parents=True, exist_ok=True)
+        if not _REVIEW_HANDLES:
+            atexit.register(_close_review_handles)
+        fh = open(path, "ab", buffering=1 << 20)
+        _REVIEW_HANDLES[path] = fh
+    return fh
+
+
 def _escalate(
     prompt: str,
     response: str,
@@ -166,7 +255,6 @@ def _escalate(
     model: str,
 ) -> None:
     """Write the refused response to the human review queue (JSONL)."""
-    Path(review_file).parent.mkdir(parents=True, exist_ok=True)
     record = {
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "model": model,
@@ -176,31 +264,49 @@ def _escalate(
         "prompt": prompt,
         "response": response,
     }
-    with open(review_file, "a", encoding="utf-8") as fh:
-        fh.write(json.dumps(record) + "\n")
+    _review_handle(review_file).write(_dumps(record) + b"\n")
 
 
 # ---------------------------------------------------------------------------
 # API call
 # ---------------------------------------------------------------------------
 
+# Lazily created so importing this module (e.g. for detect_refusal alone)
+# costs nothing; repeat calls reuse the pooled TLS connection.
+_SESSION: Optional[requests.Session] = None
 
-def _load_env() -> None:
-    env_path = Path(__file__).parent / ".env"
-    if not env_path.exists():
-        return
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or "=" not in line:
+
+def _session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return _SESSION
+
+
+def _iter_sse_data(resp: requests.Response) -> Iterator[bytes]:
+    """Yield data: payloads as bytes from 64 KiB network chunks.
+
+    Splitting whole chunks with bytes.split keeps the newline scan in C
+    and skips the per-line UTF-8 decode — json.loads parses bytes
+    directly.
+    """
+    buf = b""
+    for chunk in resp.iter_content(chunk_size=65536):
+        buf += chunk
+        if b"\n" not in buf:
             continue
-        key, _, value = line.partition("=")
-        key = key.strip().removeprefix("export ").strip()
-        value = value.strip().strip('"').strip("'")
-        if key and key not in os.environ:
-            os.environ[key] = value
+        *lines, buf = buf.split(b"\n")
+        for line in lines:
+            line = line.strip()
+            if line.startswith(b"data:"):
+                yield line[5:].strip()
+    line = buf.strip()
+    if line.startswith(b"data:"):
+        yield line[5:].strip()
 
 
-def call_ambient(
+def _stream_ambient(
     prompt: str,
     *,
     model: str = DEFAULT_MODEL,
@@ -208,7 +314,14 @@ def call_ambient(
     api_key: str = "",
     max_tokens: Optional[int] = None,
     temperature: Optional[float] = None,
-) -> str:
+    early_stop: bool = False,
+    early_stop_confidence: float = 0.85,
+) -> Tuple[str, bool]:
+    """Stream a completion; returns (text, truncated).
+
+    truncated is True when early-stop abandoned the stream, i.e. the
+    text is a partial transcript rather than the full response.
+    """
     payload: dict = {
         "model": model,
         "messages": [{"role": "user", "content": prompt}],
@@ -225,27 +338,155 @@ def call_ambient(
         "Accept": "text/event-stream",
     }
 
+    # Rescan cadence for streaming refusal detection: roughly a sentence
+    # of new text between checks keeps the scan cost negligible.
+    scan_step = 200
+
     text_parts: List[str] = []
-    with requests.post(api_url, json=payload, headers=headers, stream=True, timeout=120) as resp:
+    received = 0
+    scanned = 0
+    with _session().post(api_url, json=payload, headers=headers, stream=True, timeout=120) as resp:
         resp.raise_for_status()
-        for raw in resp.iter_lines():
-            if isinstance(raw, bytes):
-                raw = raw.decode("utf-8", errors="replace")
-            raw = raw.strip()
-            if not raw.startswith("data:"):
-                continue
-            data = raw[5:].strip()
-            if data == "[DONE]":
+        for data in _iter_sse_data(resp):
+            if data == b"[DONE]":
                 break
+            # Cheap bytes scan before any JSON work: role/usage/ping
+            # events that carry no content field are skipped outright.
+            if b'"content"' not in data:
+                continue
+            # Streams yield exactly one choice, so index it directly
+            # instead of looping; malformed frames fall into the except.
             try:
-                obj = json.loads(data)
-                for choice in obj.get("choices", []):
-                    delta = choice.get("delta", {})
-                    text_parts.append(delta.get("content") or "")
-            except json.JSONDecodeError:
+                piece = _loads(data)["choices"][0]["delta"].get("content") or ""
+            except (_JSONDecodeError, KeyError, IndexError):
                 continue
+            if piece:
+                text_parts.append(piece)
+                received += len(piece)
+
+            # Detect refusals as the response arrives and stop reading
+            # once the classification is confident — no need to pay for
+            # (or wait on) the rest of the generation.
+            if early_stop and received - scanned >= scan_step:
+                scanned = received
+                partial = "".join(text_parts)
+                decision = detect_refusal(partial)
+                if (decision.state is not RefusalState.ANSWERED
+                        and decision.confidence >= early_stop_confidence):
+                    return partial, True
+
+    return "".join(text_parts), False
+
+
+def call_ambient(prompt: str, **kwargs) -> str:
+    """Stream a completion and return the response text."""
+    return _stream_ambient(prompt, **kwargs)[0]
+
+
+# ---------------------------------------------------------------------------
+# Response cache
+# ---------------------------------------------------------------------------
+
 
-    return "".join(text_parts)
+def _cache_key(prompt: str, model: str, max_tokens: Optional[int],
+               temperature: Optional[float]) -> bytes:
+    """sha256 over the canonical JSON of the inference parameters."""
+    canonical = json.dumps(
+        {"model": model, "prompt": prompt,
+         "max_tokens": max_tokens, "temperature": temperature},
+        sort_keys=True,
+    )
+    return hashlib.sha256(canonical.encode()).digest()
+
+
+def cached_call_ambient(
+    prompt: str,
+    *,
+    cache_file: str = DEFAULT_CACHE_FILE,
+    **kwargs,
+) -> str:
+    """call_ambient with an exact-match cache in front.
+
+    Identical (model, prompt, max_tokens, temperature) tuples hit the
+    local SQLite store and return in milliseconds instead of re-paying
+    network and generation latency on every run of the same prompt.
+    Early-stopped responses are returned but never stored: they are
+    truncated transcripts, and serving one to a later run that didn't
+    ask for early stop would be indistinguishable from a full answer.
+    """
+    key = _cache_key(
+        prompt,
+        kwargs.get("model", DEFAULT_MODEL),
+        kwargs.get("max_tokens"),
+        kwargs.get("temperature"),
+    )
+    Path(cache_file).parent.mkdir(parents=True, exist_ok=True)
+    con = sqlite3.connect(cache_file)
+    try:
+        con.execute(
+            "CREATE TABLE IF NOT EXISTS responses"
+            " (key BLOB PRIMARY KEY, response TEXT, ts INT)"
+        )
+        row = con.execute(
+            "SELECT response FROM responses WHERE key = ?", (key,)
+        ).fetchone()
+        if row is not None:
+            return row[0]
+        response, truncated = _stream_ambient(prompt, **kwargs)
+        if not truncated:
+            con.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?)",
+                (key, response, int(time.time())),
+            )
+            con.commit()
+        return response
+    finally:
+        con.close()
+
+
+# ---------------------------------------------------------------------------
+# Batch mode
+# ---------------------------------------------------------------------------
+
+
+def _run_one(prompt: str, args: argparse.Namespace) -> Tuple[str, RefusalDecision]:
+    kwargs: dict = dict(
+        model=args.model,
+        api_url=args.api_url,
+        api_key=args.api_key,
+        max_tokens=args.max_tokens,
+        temperature=args.temperature,
+        early_stop=args.early_stop,
+    )
+    if args.cache:
+        response = cached_call_ambient(prompt, cache_file=args.cache_file, **kwargs)
+    else:
+        response = call_ambient(prompt, **kwargs)
+    return response, detect_refusal(response)
+
+
+def _run_batch(prompts: List[str], args: argparse.Namespace) -> None:
+    """Classify many prompts with overlapped network I/O.
+
+    call_ambient blocks on the stream, so a small thread pool turns
+    K serial round-trips into roughly one; requests' pooled session is
+    thread-safe. Results print in input order; escalations are routed
+    from the main thread so the review-queue handle is not shared.
+    """
+    with ThreadPoolExecutor(max_workers=min(8, len(prompts))) as pool:
+        futures = [pool.submit(_run_one, p, args) for p in prompts]
+        for prompt, fut in zip(prompts, futures):
+            try:
+                response, decision = fut.result()
+            except requests.RequestException as exc:
+                print(f"[ERROR    ] {prompt[:56]:56}  {exc}")
+                continue
+            route(
+                prompt, response, decision,
+                review_file=args.review_file, model=args.model, verbose=False,
+            )
+            tag = "OK" if decision.state is RefusalState.ANSWERED else "ESCALATED"
+            print(f"[{tag:9}] {decision.state.value:26} conf={decision.confidence:.2f}  {prompt[:56]}")
 
 
 # ---------------------------------------------------------------------------
@@ -254,16 +495,23 @@ def call_ambient(
 
 
 def main() -> None:
-    _load_env()
+    load_env_file()
 
     parser = argparse.ArgumentParser(description="Detect and handle Ambient API refusals")
     parser.add_argument("--prompt", default=DEFAULT_PROMPT, help="Prompt to send")
+    parser.add_argument("--prompts-file", default=None,
+                        help="File with one prompt per line; classified concurrently")
     parser.add_argument("--model", default=os.getenv("AMBIENT_MODEL", DEFAULT_MODEL))
     parser.add_argument("--api-url", default=os.getenv("AMBIENT_API_URL", DEFAULT_API_URL))
     parser.add_argument("--api-key", default=os.getenv("AMBIENT_API_KEY", ""))
     parser.add_argument("--max-tokens", type=int, default=256)
     parser.add_argument("--temperature", type=float, default=0.0)
     parser.add_argument("--review-file", default=os.getenv("REVIEW_FILE", DEFAULT_REVIEW_FILE))
+    parser.add_argument("--early-stop", action="store_true",
+                        help="Stop streaming once a refusal is detected with high confidence")
+    parser.add_argument("--cache", action="store_true",
+                        help="Serve exact repeat prompts from a local cache instead of the API")
+    parser.add_argument("--cache-file", default=os.getenv("RESPONSE_CACHE_FILE", DEFAULT_CACHE_FILE))
     parser.add_argument("--show-response", action="store_true", help="Print full model response")
     parser.add_argument("--quiet", action="store_true")
     args = parser.parse_args()
@@ -272,17 +520,44 @@ def main() -> None:
         print("Error: AMBIENT_API_KEY not set. Export it or add to .env")
         raise SystemExit(1)
 
+    if args.prompts_file:
+        prompts = [
+            line.strip()
+            for line in Path(args.prompts_file).read_text(encoding="utf-8").splitlines()
+            if line.strip()
+        ]
+        if not prompts:
+            print(f"Error: no prompts in {args.prompts_file}")
+            raise SystemExit(1)
+        print(f"Model  : {args.model}")
+        print(f"Batch  : {len(prompts)} prompts from {args.prompts_file}\n")
+        _run_batch(prompts, args)
+        return
+
     print(f"Prompt : {args.prompt[:80]}...")
     print(f"Model  : {args.model}")
 
-    response = call_ambient(
-        args.prompt,
-        model=args.model,
-        api_url=args.api_url,
-        api_key=args.api_key,
-        max_tokens=args.max_tokens,
-        temperature=args.temperature,
-    )
+    if args.cache:
+        response = cached_call_ambient(
+            args.prompt,
+            cache_file=args.cache_file,
+            model=args.model,
+            api_url=args.api_url,
+            api_key=args.api_key,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+            early_stop=args.early_stop,
+        )
+    else:
+        response = call_ambient(
+            args.prompt,
+            model=args.model,
+            api_url=args.api_url,
+            api_key=args.api_key,
+            max_tokens=args.max_tokens,
+            temperature=args.temperature,
+            early_stop=args.early_stop,
+        )
 
     decision = detect_refusal(response)
 
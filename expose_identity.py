@@ -24,6 +24,9 @@ from pathlib import Path
 from typing import List, Optional, Tuple
 
 import requests
+from requests.adapters import HTTPAdapter
+
+from ambient_client.config import load_env_file
 
 # ---------------------------------------------------------------------------
 # Defaults
@@ -252,19 +255,17 @@ class CallResult:
     error: str = ""
 
 
-def _load_env() -> None:
-    env_path = Path(__file__).parent / ".env"
-    if not env_path.exists():
-        return
-    for line in env_path.read_text(encoding="utf-8").splitlines():
-        line = line.strip()
-        if not line or line.startswith("#") or "=" not in line:
-            continue
-        key, _, value = line.partition("=")
-        key = key.strip().removeprefix("export ").strip()
-        value = value.strip().strip('"').strip("'")
-        if key and key not in os.environ:
-            os.environ[key] = value
+# Lazily created so the identity-card-only path never touches requests;
+# --live calls reuse the pooled TLS connection.
+_SESSION: Optional[requests.Session] = None
+
+
+def _session() -> requests.Session:
+    global _SESSION
+    if _SESSION is None:
+        _SESSION = requests.Session()
+        _SESSION.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=16))
+    return _SESSION
 
 
 def call_ambient(
@@ -290,23 +291,23 @@ def call_ambient(
         "messages": [{"role": "user", "content": prompt}],
     }
 
-    raw_events: List[str] = []
+    raw_events: List[bytes] = []
     text_parts: List[str] = []
     t0 = time.monotonic()
 
     try:
-        with requests.post(api_url, json=payload, headers=headers,
-                           stream=True, timeout=120) as resp:
+        with _session().post(api_url, json=payload, headers=headers,
+                             stream=True, timeout=120) as resp:
             resp.raise_for_status()
+            # Events stay bytes end to end: json.loads parses bytes
+            # directly and the hash needs bytes anyway, so no per-line
+            # isinstance check or UTF-8 decode.
             for raw in resp.iter_lines():
-                if isinstance(raw, bytes):
-                    raw = raw.decode("utf-8", errors="replace")
-                raw = raw.strip()
-                if not raw.startswith("data:"):
+                if not raw.startswith(b"data:"):
                     continue
                 data = raw[5:].strip()
                 raw_events.append(data)
-                if data == "[DONE]":
+                if data == b"[DONE]":
                     break
                 try:
                     obj = json.loads(data)
@@ -328,8 +329,7 @@ def call_ambient(
     result.response = "".join(text_parts)
 
     # Compute a local events_hash to confirm receipt integrity is checkable
-    joined = "\n".join(raw_events)
-    result.events_hash = hashlib.sha256(joined.encode()).hexdigest()
+    result.events_hash = hashlib.sha256(b"\n".join(raw_events)).hexdigest()
     result.receipt_confirmed = bool(result.events_hash) and bool(result.response)
 
     return result
@@ -439,7 +439,7 @@ def emit_json(result: CallResult, prompt: str) -> None:
 
 
 def main() -> None:
-    _load_env()
+    load_env_file()
 
     parser = argparse.ArgumentParser(
         description="Web2 #7 — Expose system identity in your app"
@@ -18,6 +18,20 @@ from pathlib import Path
 
 import requests
 
+from ambient_client.config import load_env_file
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+else:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
 
 # ---------------------------------------------------------------------------
 # Config
@@ -30,12 +44,7 @@ RECEIPT_DIR = "data/receipts"
 
 def _load_api_key() -> str:
     """Read AMBIENT_API_KEY from .env or environment."""
-    env_file = Path(__file__).parent / ".env"
-    if env_file.exists():
-        for line in env_file.read_text().splitlines():
-            line = line.strip()
-            if line.startswith("AMBIENT_API_KEY=") and not line.startswith("#"):
-                return line.split("=", 1)[1].strip().strip('"').strip("'")
+    load_env_file()
     return os.environ.get("AMBIENT_API_KEY", "")
 
 
@@ -43,8 +52,15 @@ def _load_api_key() -> str:
 # Inference
 # ---------------------------------------------------------------------------
 
-def call_ambient(api_key: str, prompt: str, max_tokens: int) -> tuple[str, list[str]]:
-    """Call Ambient streaming API. Returns (response_text, raw_events)."""
+def call_ambient(api_key: str, prompt: str, max_tokens: int) -> tuple[str, list[bytes], str]:
+    """Call Ambient streaming API.
+
+    Returns (response_text, raw_events, events_hash). Events stay bytes
+    end to end — json.loads and sha256 both consume bytes, so nothing is
+    decoded until the receipt is serialized. The hash is fed
+    incrementally as events arrive — equivalent to hashing the joined
+    blob without materializing it.
+    """
     payload = {
         "model": MODEL,
         "messages": [{"role": "user", "content": prompt}],
@@ -59,22 +75,23 @@ def call_ambient(api_key: str, prompt: str, max_tokens: int) -> tuple[str, list[
     }
 
     text = ""
-    raw_events: list[str] = []
+    raw_events: list[bytes] = []
+    events_hash = hashlib.sha256()
 
     with requests.post(API_URL, json=payload, headers=headers, stream=True, timeout=120) as resp:
         resp.raise_for_status()
         for line in resp.iter_lines():
-            if isinstance(line, bytes):
-                line = line.decode("utf-8")
-            line = line.strip()
-            if not line.startswith("data:"):
+            if not line.startswith(b"data:"):
                 continue
             data = line[5:].strip()
+            if raw_events:
+                events_hash.update(b"\n")
+            events_hash.update(data)
             raw_events.append(data)
-            if data == "[DONE]":
+            if data == b"[DONE]":
                 break
             try:
-                obj = json.loads(data)
+                obj = _loads(data)
                 for choice in obj.get("choices", []):
                     content = (choice.get("delta") or {}).get("content") or ""
                     if content:
@@ -82,19 +99,17 @@ def call_ambient(api_key: str, prompt: str, max_tokens: int) -> tuple[str, list[
                         print(content, end="", flush=True)
                     if choice.get("finish_reason") == "stop":
                         print()
-            except json.JSONDecodeError:
+            except _JSONDecodeError:
                 pass
 
-    return text, raw_events
+    return text, raw_events, events_hash.hexdigest()
 
 
 # ---------------------------------------------------------------------------
 # Receipt
 # ---------------------------------------------------------------------------
 
-def save_receipt(prompt: str, raw_events: list[str]) -> str:
-    raw_text = "\n".join(raw_events)
-    events_hash = hashlib.sha256(raw_text.encode()).hexdigest()
+def save_receipt(prompt: str, raw_events: list[bytes], events_hash: str) -> str:
     payload_hash = hashlib.sha256(
         json.dumps({"model": MODEL, "prompt": prompt}, sort_keys=True).encode()
     ).hexdigest()
@@ -109,9 +124,12 @@ def save_receipt(prompt: str, raw_events: list[str]) -> str:
         "events_hash": events_hash,
         "payload_hash": payload_hash,
         "event_count": len(raw_events),
-        "raw_events": raw_events,
+        "raw_events": [ev.decode("utf-8", errors="replace") for ev in raw_events],
     }
-    path.write_text(json.dumps(receipt, indent=2), encoding="utf-8")
+    if orjson is not None:
+        path.write_bytes(orjson.dumps(receipt, option=orjson.OPT_INDENT_2))
+    else:
+        path.write_text(json.dumps(receipt, indent=2), encoding="utf-8")
     return str(path)
 
 
@@ -149,13 +167,13 @@ def main() -> None:
     print(f"[Model]   {MODEL}")
     print(f"[Prompt]  {args.prompt}\n")
 
-    text, raw_events = call_ambient(api_key, args.prompt, args.max_tokens)
+    text, raw_events, events_hash = call_ambient(api_key, args.prompt, args.max_tokens)
 
     if not text:
         print("Error: empty response.")
         return
 
-    receipt_path = save_receipt(args.prompt, raw_events)
+    receipt_path = save_receipt(args.prompt, raw_events, events_hash)
     inspect_receipt(receipt_path)
 
 
@@ -21,14 +21,17 @@ Run:
 """
 
 import argparse
+import functools
 import json
 import os
 import re
 import sys
-from pathlib import Path
+from bisect import bisect_right
 
 import requests
 
+from ambient_client.config import load_env_file
+
 # ---------------------------------------------------------------------------
 # Defaults (overridden by .env or CLI flags)
 # ---------------------------------------------------------------------------
@@ -44,26 +47,11 @@ DEFAULT_PROMPT = (
 )
 
 # ---------------------------------------------------------------------------
-# Load .env (reuse ambient_client env loader if available)
+# Load .env (shared ambient_client loader; merges into os.environ)
 # ---------------------------------------------------------------------------
 
-def _load_env() -> dict:
-    env: dict = {}
-    env_path = Path(__file__).parent / ".env"
-    if not env_path.exists():
-        return env
-    with open(env_path) as f:
-        for line in f:
-            line = line.split("#")[0].strip()
-            if "=" in line:
-                k, _, v = line.partition("=")
-                env[k.strip()] = v.strip().strip('"').strip("'")
-    return env
-
-_env = _load_env()
-
 def _cfg(key: str, default: str = "") -> str:
-    return os.environ.get(key) or _env.get(key) or default
+    return os.environ.get(key) or default
 
 # ---------------------------------------------------------------------------
 # Verifiable patterns  (signal → kind label)
@@ -118,38 +106,123 @@ INTERPRETIVE_PATTERNS: list[tuple[str, str]] = [
 # Classifier
 # ---------------------------------------------------------------------------
 
-def _match_patterns(text: str, patterns: list[tuple[str, str]]) -> list[dict]:
+def _compile_union(patterns: list[tuple[str, str]]) -> re.Pattern:
+    """Union a pattern table into one compiled alternation.
+
+    A single finditer pass replaces one re.search per pattern; group
+    names encode the pattern index so hits map back to their kind.
+    """
+    union = "|".join(f"(?P<p{i}>{p})" for i, (p, _) in enumerate(patterns))
+    return re.compile(union, re.IGNORECASE | re.MULTILINE)
+
+
+# Lazy, memoized compilation: runs that exit before classifying anything
+# (--help, missing API key, API errors) never pay the compile cost.
+
+@functools.lru_cache(maxsize=1)
+def _v_union() -> re.Pattern:
+    return _compile_union(VERIFIABLE_PATTERNS)
+
+
+@functools.lru_cache(maxsize=1)
+def _i_union() -> re.Pattern:
+    return _compile_union(INTERPRETIVE_PATTERNS)
+
+
+def _match_patterns(text: str, union: re.Pattern,
+                    patterns: list[tuple[str, str]]) -> list[dict]:
     signals = []
-    for pattern, kind in patterns:
-        m = re.search(pattern, text, re.IGNORECASE | re.MULTILINE)
-        if m:
-            signals.append({"type": kind, "matched": m.group(0).strip()})
+    seen: set[str] = set()
+    for m in union.finditer(text):
+        g = m.lastgroup
+        if g is None or g in seen:
+            continue
+        seen.add(g)
+        kind = patterns[int(g[1:])][1]
+        signals.append({"type": kind, "matched": m.group(0).strip()})
     return signals
 
 
+def _label(v: list[dict], i: list[dict]) -> str:
+    if v and i:
+        return "MIXED"
+    if v:
+        return "VERIFIABLE"
+    if i:
+        return "INTERPRETIVE"
+    # Unclassified prose defaults to INTERPRETIVE (can't be checked externally)
+    i.append({"type": "default", "matched": "(no explicit signal — prose)"})
+    return "INTERPRETIVE"
+
+
 def classify_sentence(sentence: str) -> tuple[str, list[dict]]:
     """Return (VERIFIABLE | INTERPRETIVE | MIXED, signals)."""
-    v = _match_patterns(sentence, VERIFIABLE_PATTERNS)
-    i = _match_patterns(sentence, INTERPRETIVE_PATTERNS)
+    v = _match_patterns(sentence, _v_union(), VERIFIABLE_PATTERNS)
+    i = _match_patterns(sentence, _i_union(), INTERPRETIVE_PATTERNS)
+    label = _label(v, i)
+    return label, v + i
 
-    if v and i:
-        label = "MIXED"
-    elif v:
-        label = "VERIFIABLE"
-    elif i:
-        label = "INTERPRETIVE"
-    else:
-        # Unclassified prose defaults to INTERPRETIVE (can't be checked externally)
-        label = "INTERPRETIVE"
-        i.append({"type": "default", "matched": "(no explicit signal — prose)"})
 
-    return label, v + i
+_SENT_BOUNDARY = re.compile(r'(?<=[.?!])\s+|\n+')
+
+
+def _sentence_spans(text: str) -> list[tuple[int, int]]:
+    """(start, end) offsets of each kept sentence; same filtering as
+    split_sentences (non-empty after strip, longer than 10 chars)."""
+    spans = []
+    start = 0
+    for m in _SENT_BOUNDARY.finditer(text):
+        spans.append((start, m.start()))
+        start = m.end()
+    spans.append((start, len(text)))
+    kept = []
+    for s, e in spans:
+        seg = text[s:e]
+        stripped = seg.strip()
+        if stripped and len(stripped) > 10:
+            ls = s + (len(seg) - len(seg.lstrip()))
+            kept.append((ls, ls + len(stripped)))
+    return kept
+
+
+def classify_layers(text: str) -> list[tuple[str, str, list[dict]]]:
+    """Classify every sentence of a response in two regex passes total.
+
+    Runs each union's finditer over the whole text once and assigns hits
+    to their owning sentence by bisecting over sentence-start offsets —
+    one linear scan per layer instead of re-scanning every sentence.
+    Returns [(sentence, label, signals), ...].
+    """
+    spans = _sentence_spans(text)
+    starts = [s for s, _ in spans]
+    v_sigs: list[list[dict]] = [[] for _ in spans]
+    i_sigs: list[list[dict]] = [[] for _ in spans]
+    for union, patterns, sinks in (
+        (_v_union(), VERIFIABLE_PATTERNS, v_sigs),
+        (_i_union(), INTERPRETIVE_PATTERNS, i_sigs),
+    ):
+        seen: set[tuple[int, str]] = set()
+        for m in union.finditer(text):
+            idx = bisect_right(starts, m.start()) - 1
+            if idx < 0 or m.start() >= spans[idx][1]:
+                continue  # hit in a gap or a filtered-out fragment
+            g = m.lastgroup
+            if g is None or (idx, g) in seen:
+                continue
+            seen.add((idx, g))
+            kind = patterns[int(g[1:])][1]
+            sinks[idx].append({"type": kind, "matched": m.group(0).strip()})
+
+    results = []
+    for idx, (s, e) in enumerate(spans):
+        v, i = v_sigs[idx], i_sigs[idx]
+        results.append((text[s:e], _label(v, i), v + i))
+    return results
 
 
 def split_sentences(text: str) -> list[str]:
     """Split on sentence boundaries and newlines; skip very short fragments."""
-    raw = re.split(r'(?<=[.?!])\s+|\n+', text)
-    return [s.strip() for s in raw if s.strip() and len(s.strip()) > 10]
+    return [text[s:e] for s, e in _sentence_spans(text)]
 
 # ---------------------------------------------------------------------------
 # Ambient API call (streaming)
@@ -179,14 +252,13 @@ def call_ambient(prompt: str, api_url: str, api_key: str,
         timeout=60,
     ) as r:
         r.raise_for_status()
+        # Events stay bytes: json.loads parses them directly, so there
+        # is no per-line UTF-8 decode.
         for line in r.iter_lines():
-            if not line:
-                continue
-            line = line.decode("utf-8", errors="replace")
-            if not line.startswith("data:"):
+            if not line.startswith(b"data:"):
                 continue
             data = line[5:].strip()
-            if data == "[DONE]":
+            if data == b"[DONE]":
                 break
             try:
                 obj = json.loads(data)
@@ -216,11 +288,8 @@ def run(prompt: str, api_url: str, api_key: str,
         print(response)
         print("─" * 62 + "\n")
 
-    sentences = split_sentences(response)
-
     layers: dict[str, list] = {"VERIFIABLE": [], "INTERPRETIVE": [], "MIXED": []}
-    for sent in sentences:
-        label, signals = classify_sentence(sent)
+    for sent, label, signals in classify_layers(response):
         layers[label].append({"text": sent, "signals": signals})
 
     # ── Print layered report ─────────────────────────────────────────────────
@@ -251,6 +320,7 @@ def run(prompt: str, api_url: str, api_key: str,
 
 
 if __name__ == "__main__":
+    load_env_file()
     parser = argparse.ArgumentParser(
         description="Split an Ambient API response into verifiable and interpretive layers."
     )
@@ -20,8 +20,13 @@ from ambient_client.app.openai_provider import get_openai_settings
 from ambient_client.app.provider_utils import ProviderSettings
 from ambient_client.config import load_env_file
 from ambient_client.streaming import StreamResult, stream_chat
+from ambient_client.utils import truncate
 
 
+# Comparison-table separators, built once at import.
+_CMP_SEP = "─" * 56
+_CMP_RULE = f"  {'─' * 20} {'─' * 14} {'─' * 14}"
+
 # ---------------------------------------------------------------------------
 # Single provider run — prints tokens live, reports latency
 # ---------------------------------------------------------------------------
@@ -30,7 +35,7 @@ def run_provider(provider: ProviderSettings, prompt: str, max_tokens: int, tempe
     model = provider.models[0]
 
     print(f"\n[{provider.name} / {model}]")
-    print(f"[Prompt] {prompt[:80]}{'…' if len(prompt) > 80 else ''}\n")
+    print(f"[Prompt] {truncate(prompt)}\n")
 
     result = stream_chat(
         api_url=provider.api_url,
@@ -47,8 +52,8 @@ def run_provider(provider: ProviderSettings, prompt: str, max_tokens: int, tempe
     if result.error:
         print(f"\n[error] {result.error}")
     else:
-        ttfb = f"{result.ttfb_ms:.0f}ms" if result.ttfb_ms is not None else "n/a"
-        ttc  = f"{result.ttc_ms:.0f}ms"  if result.ttc_ms  is not None else "n/a"
+        ttfb = f"{result.ttfb_ms}ms" if result.ttfb_ms is not None else "n/a"
+        ttc  = f"{result.ttc_ms}ms"  if result.ttc_ms  is not None else "n/a"
         print(f"\n[ttfb={ttfb}  ttc={ttc}  "
               f"tokens={result.prompt_tokens}+{result.completion_tokens}  "
               f"stalls={result.stall_count}]")
@@ -81,16 +86,16 @@ def run_compare(prompt: str, max_tokens: int, temperature: float) -> None:
         return
 
     # Summary table
-    print(f"\n{'─' * 56}")
+    print(f"\n{_CMP_SEP}")
     print("  LATENCY SUMMARY")
-    print(f"{'─' * 56}")
+    print(_CMP_SEP)
     header = f"  {'Metric':<20} {'Ambient':>14} {'OpenAI':>14}"
     print(header)
-    print(f"  {'─'*20} {'─'*14} {'─'*14}")
+    print(_CMP_RULE)
 
     def ms(r: StreamResult, attr: str) -> str:
         v = getattr(r, attr)
-        return f"{v:,.0f} ms" if v is not None else "n/a"
+        return f"{v:,} ms" if v is not None else "n/a"
 
     ambient_r = results[0][1]
     openai_r  = results[1][1]
@@ -106,7 +111,7 @@ def run_compare(prompt: str, max_tokens: int, temperature: float) -> None:
     for label, a_val, o_val in rows:
         print(f"  {label:<20} {a_val:>14} {o_val:>14}")
 
-    print(f"{'─' * 56}")
+    print(_CMP_SEP)
 
 
 # ---------------------------------------------------------------------------
@@ -9,32 +9,47 @@ Usage:
 """
 
 import argparse
+import base64
 import hashlib
 import json
+import mmap
 import os
 import sys
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass, field
 from pathlib import Path
 from typing import List, Optional, Tuple
 
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+if orjson is not None:
+    _loads = orjson.loads
+    _JSONDecodeError = orjson.JSONDecodeError
+else:
+    _loads = json.loads
+    _JSONDecodeError = json.JSONDecodeError
+
 
 # ---------------------------------------------------------------------------
 # Check results
 # ---------------------------------------------------------------------------
 
-PASS = "PASS"
-FAIL = "FAIL"
-SKIP = "SKIP"
+PASS: str = "PASS"
+FAIL: str = "FAIL"
+SKIP: str = "SKIP"
 
 
-@dataclass
+@dataclass(slots=True)
 class Check:
     name: str
     status: str       # PASS | FAIL | SKIP
     detail: str = ""
 
 
-@dataclass
+@dataclass(slots=True)
 class VerifyResult:
     receipt_path: str
     checks: List[Check] = field(default_factory=list)
@@ -44,6 +59,10 @@ class VerifyResult:
     completion_tokens: int = 0
     content_chars: int = 0
     content_deltas: int = 0
+    # Parsed event objects ([DONE]/malformed slots are None); callers
+    # re-verifying a mutated copy of the same stream can pass these back
+    # to skip the JSON re-parse.
+    parsed_events: List[Optional[dict]] = field(default_factory=list)
 
     @property
     def verified(self) -> bool:
@@ -54,20 +73,136 @@ class VerifyResult:
 # Core verification logic
 # ---------------------------------------------------------------------------
 
-def _hash(text: str) -> str:
-    return hashlib.sha256(text.encode()).hexdigest()
+def _is_hex_sha256(value: str) -> bool:
+    """True for a 64-char lowercase hex digest; validation runs in C.
+
+    bytes.fromhex rather than int(value, 16): both validate in C, but
+    fromhex enforces whole hex pairs while int() accepts underscores,
+    leading whitespace and a sign — too loose for a digest field.
+    """
+    if len(value) != 64 or value.lower() != value:
+        return False
+    try:
+        bytes.fromhex(value)
+    except ValueError:
+        return False
+    return True
+
+
+def _event_list(data: dict) -> Tuple[List[bytes], Optional[bytes]]:
+    """Return (events as bytes, joined blob or None).
+
+    Newer receipts store one base64 blob plus start offsets, so events
+    come back as zero-copy-ish slices and the blob hashes in one shot.
+    Older receipts with a raw_events string list are encoded per event.
+    """
+    b64 = data.get("raw_events_b64")
+    if b64 is not None:
+        blob = base64.b64decode(b64)
+        offsets: List[int] = data.get("event_offsets") or []
+        ends = [offsets[i + 1] - 1 for i in range(len(offsets) - 1)] + [len(blob)]
+        return [blob[s:e] for s, e in zip(offsets, ends)], blob
+    return [ev.encode() for ev in data.get("raw_events", [])], None
+
+
+def _derive_events_hash(raw_events: List[bytes], blob: Optional[bytes]) -> str:
+    h = hashlib.sha256()
+    if blob is not None:
+        h.update(blob)
+    else:
+        for i, ev in enumerate(raw_events):
+            if i:
+                h.update(b"\n")
+            h.update(ev)
+    return h.hexdigest()
+
+
+_FAST_FAIL_SKIPS: Tuple[str, ...] = ("payload_hash", "event parsing", "content", "usage")
 
 
-def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
+def verify_receipt(
+    data: dict,
+    receipt_path: str,
+    parsed_events: Optional[List[Optional[dict]]] = None,
+    fast_fail: bool = False,
+) -> VerifyResult:
     result = VerifyResult(receipt_path=receipt_path)
     result.model = data.get("model", "unknown")
 
-    raw_events: List[str] = data.get("raw_events", [])
+    raw_events, blob = _event_list(data)
     result.event_count = len(raw_events)
 
-    # --- Check 1: events_hash ---
+    # --- Fast-fail: hash before anything else ---
+    # Hashing is far cheaper than parsing, so when auditing receipts
+    # that are expected to be tampered, checking the hash first skips
+    # the whole parse + content walk. The remaining checks report SKIP
+    # to keep the report shape stable.
     stored_events_hash = data.get("events_hash", "")
-    derived_events_hash = _hash("\n".join(raw_events))
+    derived_events_hash: Optional[str] = None
+    if fast_fail and stored_events_hash:
+        derived_events_hash = _derive_events_hash(raw_events, blob)
+        if derived_events_hash != stored_events_hash:
+            result.checks.append(Check("events_hash", FAIL,
+                f"MISMATCH — expected {stored_events_hash[:16]}… got {derived_events_hash[:16]}…"))
+            for name in _FAST_FAIL_SKIPS:
+                result.checks.append(Check(name, SKIP,
+                    "skipped (--fast-fail after events_hash mismatch)"))
+            return result
+
+    # --- Fused event scan ---
+    # One walk over raw_events feeds the running hash, parses each
+    # event, reconstructs content, and records the last usage block —
+    # instead of four separate passes (hash join, parse loop, content
+    # loop, reversed usage scan) over the same list.
+    hash_done = derived_events_hash is not None
+    h = hashlib.sha256()
+    if not hash_done and blob is not None:
+        h.update(blob)
+    parse_errors = 0
+    # A caller-supplied parsed list (same length as the events) skips
+    # the JSON parse; the hash is always recomputed from the raw bytes.
+    reuse = parsed_events is not None and len(parsed_events) == result.event_count
+    parsed: List[Optional[dict]] = (
+        parsed_events if reuse else [None] * result.event_count
+    )
+    # Content pieces collect in a list and join once — linear instead of
+    # the quadratic copy-on-concat of growing a str per delta.
+    content_parts: List[str] = []
+    last_usage: dict = {}
+    for i, ev in enumerate(raw_events):
+        if not hash_done and blob is None:
+            if i:
+                h.update(b"\n")
+            h.update(ev)
+        if reuse:
+            obj = parsed[i]
+            if obj is None:
+                if ev.strip() != b"[DONE]":
+                    parse_errors += 1
+                continue
+        else:
+            if ev.strip() == b"[DONE]":
+                continue
+            try:
+                obj = _loads(ev)
+            except _JSONDecodeError:
+                parse_errors += 1
+                continue
+            parsed[i] = obj
+        for choice in obj.get("choices", []):
+            delta = choice.get("delta") or {}
+            if delta.get("content"):
+                content_parts.append(delta["content"])
+                result.content_deltas += 1
+        usage = obj.get("usage") or {}
+        if usage.get("prompt_tokens") or usage.get("completion_tokens"):
+            last_usage = usage
+    if not hash_done:
+        derived_events_hash = h.hexdigest()
+    content = "".join(content_parts)
+    result.parsed_events = parsed
+
+    # --- Check 1: events_hash ---
     if not stored_events_hash:
         result.checks.append(Check("events_hash", SKIP, "field missing in receipt"))
     elif derived_events_hash == stored_events_hash:
@@ -84,7 +219,7 @@ def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
     else:
         # We can't re-derive the payload from the receipt alone, but we can confirm
         # the field is present and is a valid sha256 hex string.
-        if len(stored_payload_hash) == 64 and all(c in "0123456789abcdef" for c in stored_payload_hash):
+        if _is_hex_sha256(stored_payload_hash):
             result.checks.append(Check("payload_hash", PASS,
                 f"present and well-formed ({stored_payload_hash[:16]}…)"))
         else:
@@ -92,18 +227,6 @@ def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
                 f"malformed hash value: {stored_payload_hash!r}"))
 
     # --- Check 3: event parsing ---
-    parse_errors = 0
-    parsed_events = []
-    for ev in raw_events:
-        if ev.strip() == "[DONE]":
-            parsed_events.append(None)
-            continue
-        try:
-            parsed_events.append(json.loads(ev))
-        except json.JSONDecodeError:
-            parse_errors += 1
-            parsed_events.append(None)
-
     valid_count = result.event_count - parse_errors
     if parse_errors == 0:
         result.checks.append(Check("event parsing", PASS,
@@ -113,15 +236,6 @@ def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
             f"{parse_errors} parse error(s) out of {result.event_count} events"))
 
     # --- Check 4: content reconstruction ---
-    content = ""
-    for obj in parsed_events:
-        if obj is None:
-            continue
-        for choice in obj.get("choices", []):
-            delta = choice.get("delta") or {}
-            content += delta.get("content") or ""
-            result.content_deltas += 1 if delta.get("content") else 0
-
     result.content_chars = len(content)
     if result.content_chars > 0:
         result.checks.append(Check("content", PASS,
@@ -130,16 +244,8 @@ def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
         result.checks.append(Check("content", FAIL, "no content tokens found in events"))
 
     # --- Check 5: usage tokens ---
-    for obj in reversed(parsed_events):
-        if obj is None:
-            continue
-        usage = obj.get("usage") or {}
-        pt = usage.get("prompt_tokens", 0)
-        ct = usage.get("completion_tokens", 0)
-        if pt or ct:
-            result.prompt_tokens = pt
-            result.completion_tokens = ct
-            break
+    result.prompt_tokens = last_usage.get("prompt_tokens", 0)
+    result.completion_tokens = last_usage.get("completion_tokens", 0)
 
     if result.prompt_tokens > 0 or result.completion_tokens > 0:
         result.checks.append(Check("usage", PASS,
@@ -156,30 +262,88 @@ def verify_receipt(data: dict, receipt_path: str) -> VerifyResult:
 # ---------------------------------------------------------------------------
 
 def _latest_receipt(receipt_dir: str) -> Optional[Path]:
-    receipts = sorted(Path(receipt_dir).glob("*.json"), key=lambda p: p.stat().st_mtime)
-    return receipts[-1] if receipts else None
+    # scandir DirEntry caches its stat, so this is one readdir plus one
+    # stat per file — the glob + stat-per-sort-key version re-stat'd
+    # paths inside the comparison.
+    try:
+        with os.scandir(receipt_dir) as entries:
+            latest = max(
+                (
+                    (e.stat().st_mtime, e.path)
+                    for e in entries
+                    if e.is_file() and e.name.endswith(".json")
+                ),
+                default=None,
+            )
+    except OSError:
+        return None
+    return Path(latest[1]) if latest else None
+
+
+# Expected top-level field types; unknown keys pass through untouched so
+# the format can evolve without breaking older verifiers.
+_ENVELOPE_TYPES: Tuple[Tuple[str, type], ...] = (
+    ("model", str),
+    ("events_hash", str),
+    ("payload_hash", str),
+    ("raw_events", list),
+    ("raw_events_b64", str),
+    ("event_offsets", list),
+)
+
+
+def _validate_envelope(data: object, path: str) -> dict:
+    """Reject structurally broken receipts at load time.
+
+    One cheap isinstance pass over the known keys, so a receipt with the
+    wrong shape fails with a clear message here instead of a confusing
+    TypeError deep inside verification. Raises ValueError; the caller
+    decides whether that exits the CLI or rejects one batch entry.
+    """
+    if not isinstance(data, dict):
+        raise ValueError(f"receipt is not a JSON object: {path}")
+    for key, expected in _ENVELOPE_TYPES:
+        if key in data and not isinstance(data[key], expected):
+            raise ValueError(f"receipt field {key!r} is not a {expected.__name__}: {path}")
+    return data
 
 
 def _load_receipt(path: str) -> Tuple[dict, str]:
+    """Load and envelope-check one receipt.
+
+    Raises OSError for unreadable files and ValueError for unparseable
+    or malformed ones; callers decide whether that exits the CLI or
+    just marks the receipt rejected.
+    """
     p = Path(path)
     if not p.exists():
-        print(f"Error: receipt file not found: {path}")
-        sys.exit(1)
-    data = json.loads(p.read_text(encoding="utf-8"))
-    return data, str(p)
+        raise FileNotFoundError(f"receipt file not found: {path}")
+    # Parse straight out of the page cache: mmap avoids the read copy
+    # and orjson parses the UTF-8 buffer in place, skipping the
+    # bytes -> str decode read_text paid on multi-MB receipts.
+    with open(p, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+        try:
+            if orjson is not None:
+                data = orjson.loads(memoryview(mm))
+            else:
+                data = json.loads(mm[:])
+        except _JSONDecodeError as exc:
+            raise ValueError(f"receipt is not valid JSON: {path} ({exc})") from exc
+    return _validate_envelope(data, str(p)), str(p)
 
 
 # ---------------------------------------------------------------------------
 # Printer
 # ---------------------------------------------------------------------------
 
-WIDTH = 62
+WIDTH: int = 62
+_SEP: str = "─" * WIDTH
 
 def _print_result(result: VerifyResult, label: str = "") -> None:
     if label:
-        print(f"\n{'─' * WIDTH}")
+        print(f"\n{_SEP}")
         print(f"  {label}")
-    print(f"{'─' * WIDTH}")
+    print(_SEP)
     print(f"  Receipt  : {result.receipt_path}")
     print(f"  Model    : {result.model}")
     print(f"  Events   : {result.event_count}  |  "
@@ -198,7 +362,65 @@ def _print_result(result: VerifyResult, label: str = "") -> None:
         failed = [c for c in result.checks if c.status == FAIL]
         reasons = ", ".join(c.name for c in failed)
         print(f"  Status: REJECTED ✗  (reason: {reasons})")
-    print(f"{'─' * WIDTH}")
+    print(_SEP)
+
+
+# ---------------------------------------------------------------------------
+# --batch mode
+# ---------------------------------------------------------------------------
+
+def _verify_one(path: str, fast_fail: bool = False) -> VerifyResult:
+    """Load and verify a single receipt; top-level so it pickles.
+
+    Load failures come back as a failed "load" check rather than an
+    exception — a corrupt or truncated file is an audit finding, and
+    letting it escape would abort the whole batch in pool.map.
+    """
+    try:
+        data, receipt_path = _load_receipt(path)
+    except (OSError, ValueError) as exc:
+        result = VerifyResult(receipt_path=path)
+        result.checks.append(Check("load", FAIL, str(exc)))
+        return result
+    return verify_receipt(data, receipt_path, fast_fail=fast_fail)
+
+
+def _verify_batch(receipt_dir: str, fast_fail: bool = False) -> None:
+    """Verify every receipt in a directory across all cores.
+
+    SHA-256 and JSON parsing are CPU-bound per file and independent, so
+    a process pool scales the audit near-linearly with core count.
+    """
+    try:
+        with os.scandir(receipt_dir) as entries:
+            paths = sorted(
+                e.path for e in entries
+                if e.is_file() and e.name.endswith(".json")
+            )
+    except OSError:
+        paths = []
+    if not paths:
+        print(f"No receipts found in '{receipt_dir}'.")
+        sys.exit(1)
+
+    workers = os.cpu_count() or 1
+    chunksize = max(1, len(paths) // (workers * 4))
+    verified = 0
+    with ProcessPoolExecutor() as pool:
+        for res in pool.map(_verify_one, paths,
+                            [fast_fail] * len(paths), chunksize=chunksize):
+            if res.verified:
+                verified += 1
+                print(f"  ✓ VERIFIED  {res.receipt_path}")
+            else:
+                failed = ", ".join(c.name for c in res.checks if c.status == FAIL)
+                print(f"  ✗ REJECTED  {res.receipt_path}  ({failed})")
+
+    rejected = len(paths) - verified
+    print(f"\n  Total: {len(paths)} receipts  |  "
+          f"verified: {verified}  |  rejected: {rejected}")
+    if rejected:
+        sys.exit(1)
 
 
 # ---------------------------------------------------------------------------
@@ -209,6 +431,7 @@ def _generate_and_verify(receipt_dir: str, temperature: float, max_tokens: int)
     from ambient_client.app.ambient import get_ambient_settings
     from ambient_client.config import load_env_file
     from ambient_client.streaming import stream_chat
+    from ambient_client.utils import truncate
 
     load_env_file()
     provider = get_ambient_settings()
@@ -222,7 +445,7 @@ def _generate_and_verify(receipt_dir: str, temperature: float, max_tokens: int)
         "What is compound interest? Give a brief definition and a worked example.")
 
     print(f"[Model]  {model}")
-    print(f"[Prompt] {prompt[:80]}{'…' if len(prompt) > 80 else ''}")
+    print(f"[Prompt] {truncate(prompt)}")
     print("\nCalling Ambient API (receipt will be saved)...")
 
     result = stream_chat(
@@ -257,11 +480,18 @@ def main() -> None:
     p.add_argument("receipt",       nargs="?",      help="Path to receipt JSON (default: most recent)")
     p.add_argument("--tamper",      action="store_true", help="Simulate a tampered receipt → REJECTED")
     p.add_argument("--generate",    action="store_true", help="Call Ambient, save receipt, then verify")
+    p.add_argument("--batch",       metavar="DIR",  help="Verify every receipt in DIR across all cores")
+    p.add_argument("--fast-fail",   action="store_true",
+                   help="Check events_hash first and skip the remaining checks on a mismatch")
     p.add_argument("--receipt-dir", default="data/receipts")
     p.add_argument("--max-tokens",  type=int,   default=256)
     p.add_argument("--temperature", type=float, default=0.0)
     args = p.parse_args()
 
+    if args.batch:
+        _verify_batch(args.batch, fast_fail=args.fast_fail)
+        return
+
     # Resolve receipt path
     if args.generate:
         receipt_path = _generate_and_verify(args.receipt_dir, args.temperature, args.max_tokens)
@@ -274,10 +504,14 @@ def main() -> None:
             sys.exit(1)
         receipt_path = str(latest)
 
-    data, receipt_path = _load_receipt(receipt_path)
+    try:
+        data, receipt_path = _load_receipt(receipt_path)
+    except (OSError, ValueError) as exc:
+        print(f"Error: {exc}")
+        sys.exit(1)
 
     # --- Normal verification ---
-    result = verify_receipt(data, receipt_path)
+    result = verify_receipt(data, receipt_path, fast_fail=args.fast_fail)
     _print_result(result, label="VERIFICATION" if args.tamper else "")
 
     if not args.tamper:
@@ -285,18 +519,32 @@ def main() -> None:
 
     # --- Tamper simulation ---
     print()
-    tampered = dict(data)
-    raw = list(data.get("raw_events", []))
+    # Rebuild as a plain event list so the injection works for both
+    # receipt formats; the verifier reads either.
+    raw = [ev.decode("utf-8", errors="replace") for ev in _event_list(data)[0]]
 
     # Inject a fabricated token into the middle of the event stream
-    fake_event = json.dumps({
+    fake_obj = {
         "choices": [{"delta": {"content": " [INJECTED_TOKEN]"}, "finish_reason": None}]
-    })
+    }
     mid = len(raw) // 2
-    raw.insert(mid, fake_event)
-    tampered["raw_events"] = raw
-
-    tampered_result = verify_receipt(tampered, receipt_path + " [tampered]")
+    raw.insert(mid, json.dumps(fake_obj))
+
+    # One C-level unpack with the override in place, rather than a
+    # filtering comprehension plus a rebind; the blob keys must go so
+    # the verifier reads the injected list.
+    tampered = {**data, "raw_events": raw}
+    tampered.pop("raw_events_b64", None)
+    tampered.pop("event_offsets", None)
+
+    # Splice the parsed fake object into the first verification's parsed
+    # list so the re-verification only re-hashes; no JSON re-parse.
+    tampered_parsed = list(result.parsed_events)
+    tampered_parsed.insert(mid, fake_obj)
+
+    tampered_result = verify_receipt(
+        tampered, receipt_path + " [tampered]", parsed_events=tampered_parsed
+    )
     _print_result(tampered_result, label="TAMPER SIMULATION — injected fake token at event midpoint")
 
 